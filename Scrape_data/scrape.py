@@ -8,57 +8,333 @@ Scraped data is saved in subdirectories of a directory named data, which is
 created in the working directory if it does not already exist.
 """
 # Standard-library imports
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import functools
+import gzip
+import json
 import logging
 from pathlib import Path
-import pprint
+import random
 import re
+import shutil
+import subprocess
 import sys
+import threading
 import time
 
 # Third-party imports
-from bs4 import BeautifulSoup
+import lxml.etree
+import lxml.html
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Import and initialize tika for pdf parsing
-import tika
-
-tika.initVM()
-from tika import parser
+# tika, which is used for pdf parsing only when poppler is not installed, is
+# imported by _parse_with_tika the first time that it is needed.
 
 # _BASE_URL is prepended to relative urls in following links.
 _BASE_URL = 'https://www.rrc.state.tx.us'
 
-# Delay between requests for data from RRC.  Browsing the site shows that the
-# it can be slow, so the delay is set to be long.
+# Minimum interval in seconds between the starts of successive requests for
+# data from RRC while the site is responding normally.  Browsing the site shows
+# that the it can be slow, so the delay is set to be long.  Time spent
+# receiving, saving, and processing a response counts toward the delay, so the
+# scraper only waits for whatever part of the interval remains when the next
+# request is ready to go.
 _DELAY = 5
 
+# Requests are paced by a token bucket shared by all threads.  The rate of
+# requests starts at (and never exceeds) one per _DELAY seconds.  Each time RRC
+# answers with 429 (too many requests) or a server error, or a read times out,
+# the rate is halved, down to _MIN_RATE requests per second (one request a
+# minute), and each successful response then raises it again by _RATE_STEP.
+# The bucket holds a single token, so requests are never sent in a burst after
+# an idle period.
+_MIN_RATE = 1 / 60
+_RATE_STEP = 0.01
+
+# Number of threads used to download binary files.  The threads share the token
+# bucket, so they do not increase the rate of requests to RRC, but a slow
+# transfer no longer holds up the start of the next request.
+_DOWNLOAD_WORKERS = 4
+
 # The RRC site states that the data is provided for individuals who want
 # specific information, rather than for automated data collection.  To avoid
 # issues, I am including my current _USER_AGENT with download requests.
 _USER_AGENT = 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:78.0) Gecko/20100101 Firefox/78.0'
 
+# All requests go to the same host, so a single session is shared by every
+# request.  The session keeps the connection to RRC alive between requests,
+# which avoids a new TCP/TLS handshake for each of the many downloaded files.
+_SESSION = requests.Session()
+_SESSION.headers.update({'user-agent': _USER_AGENT})
+atexit.register(_SESSION.close)
+
+# Maximum time in seconds to wait before retrying a failed request, unless RRC
+# asks for a longer wait with a Retry-After header.
+_MAX_BACKOFF = 30
+
+# Maximum wait in seconds asked for by a Retry-After header that is honored.
+# If RRC asks for a longer wait, the request is not retried, rather than leaving
+# a download thread asleep for (possibly) hours.
+_MAX_RETRY_AFTER = 10 * _MAX_BACKOFF
+
+
+def _add_jitter(backoff):
+    """Add up to 50% random jitter to a back-off time and cap it at
+    _MAX_BACKOFF seconds, so that retries from several download threads do not
+    all hit RRC at the same moment."""
+    return min(_MAX_BACKOFF, backoff * (1 + random.uniform(0, 0.5)))
+
+
+class _JitteredRetry(Retry):
+    """Retry policy that passes the back-off time through _add_jitter."""
+
+    def get_backoff_time(self):
+        return _add_jitter(super().get_backoff_time())
+
+
+# Transient failures are retried with exponential back-off rather than ending
+# the scrape of a page.  Failures to connect to RRC are retried here, by
+# urllib3.  Rate limiting, server errors, and read timeouts are retried by _get
+# instead, so that every attempt waits for a token and adjusts the rate of
+# requests.  For the same reason, urllib3 is told not to act on Retry-After.
+_RETRY = _JitteredRetry(total=5, connect=5, read=False, backoff_factor=1,
+                        respect_retry_after_header=False)
+
+# Responses with these status codes are retried by _get, up to _MAX_RETRIES
+# times.  If the retries are exhausted, the last response is used, so that _get
+# still raises requests.HTTPError for a bad status.
+_RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+_MAX_RETRIES = 5
+
+# Only one host is contacted, so the adapter needs a single connection pool.
+# The pool can hold several connections so that the keep-alive connection is
+# not discarded if more than one request is ever in flight at a time.
+_SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=8,
+                                       max_retries=_RETRY))
+
+# Timeout in seconds for connecting to RRC and for each read from the
+# connection, so that a stalled connection is retried instead of hanging.
+_TIMEOUT = 30
+
 # Scraped data is downloaded in subdirectories of _DATA_ROOT.  If the directory
 # does not already exist in the working directory, it is created.
-_DATA_ROOT = 'data'
-
+_DATA_ROOT = Path('data')
+
+# Subdirectories of _DATA_ROOT in which the scraped reports are saved.
+_QUARTERLY_REPORTS_DIR = Path('cleanup_reports') / 'quarterly'
+_ANNUAL_REPORTS_DIR = Path('cleanup_reports') / 'annual'
+_DISTRIBUTION_REPORTS_DIR = Path('well_distributions')
+_ABANDONED_WELLS_DIR = Path('abandoned_wells')
+
+# Every page that is scraped is cached in _PAGE_CACHE inside _DATA_ROOT, with
+# its validators and character encoding saved in the same way as for the binary
+# files.  On later runs, a page is requested with a conditional request, and
+# the cached copy is used if the page has not changed.
+#
 # Testing shows that the html strings obtained from RRC using the requests
 # module are significantly different than what is obtained by the browser, even
-# when user-agent is specified in the request header.  Prettified versions of
-# the html programmatically are saved in _SAVED_PAGES inside _DATA_ROOT.  The
-# saved html is used to develop detailed scraping commands.
-_SAVED_PAGES = 'saved_pages'
+# when user-agent is specified in the request header.  The cached pages hold
+# the html exactly as obtained programmatically, so they are also the pages to
+# use in developing detailed scraping commands.
+_PAGE_CACHE = Path('page_cache')
+
+# Binary files are streamed to disk in chunks of _CHUNK_SIZE bytes, so that a
+# large file is never held in memory in its entirety.
+_CHUNK_SIZE = 64 * 1024
+
+# The HTTP validators (ETag and Last-Modified headers) returned with each
+# downloaded binary file are saved in _VALIDATORS inside _DATA_ROOT.  On later
+# runs, the validators are sent with a conditional request, and a file that has
+# not changed on the RRC site is not downloaded again.
+_VALIDATORS = 'validators.json'
+
+# Dictionary mapping urls to saved validators, or None if _VALIDATORS has not
+# been read yet.  _VALIDATORS_LOCK guards the dictionary and the file, which are
+# updated by the download threads.
+_validators = None
+_VALIDATORS_LOCK = threading.RLock()
+
+# Binary files and cached pages that were checked against RRC within the last
+# _MAX_AGE seconds are assumed to be unchanged, and no request is made for them.
+# This makes it cheap to rerun the module, for example after fixing a problem
+# with one of the pages.
+_MAX_AGE = 24 * 60 * 60
+
+# Text is extracted from downloaded pdf files in background threads, so that
+# parsing overlaps with the delay before the next download instead of adding to
+# it.  Two workers let a slow pdf be parsed while the next one starts.
+_PARSE_EXECUTOR = ThreadPoolExecutor(max_workers=2)
+
+# Futures for the pdf files submitted to _PARSE_EXECUTOR.
+_parse_futures = []
+
+# Text and metadata are extracted from pdf files using the pdftotext and pdfinfo
+# utilities from poppler if pdftotext is installed.  Poppler runs directly on
+# the file and is much faster than tika, which passes each file through an
+# HTTP server running in a JVM.  Tika is used if pdftotext is not available.
+_PDFTOTEXT = shutil.which('pdftotext')
+_PDFINFO = shutil.which('pdfinfo')
+
+# The tika parser module, or None if tika has not been used yet.  _TIKA_LOCK is
+# held during the first call to tika, which starts the tika server.
+_tika_parser = None
+_TIKA_LOCK = threading.Lock()
+
+# Timeout in seconds for a request to the tika server.  The default used by
+# tika is 60 seconds, which is not always enough for a long annual report.
+_TIKA_TIMEOUT = 300
+
+# Patterns and tables used repeatedly in generating filenames from the text of
+# link tags.  _YEAR_RE extracts the year at the end of a filename such as
+# January_29_2011.pdf.  _FILENAME_TRANS replaces spaces with underscores and
+# removes commas in a single pass over a string.
+_YEAR_RE = re.compile(r'(\d{4})\.')
+_FILENAME_TRANS = str.maketrans({' ': '_', ',': None})
+
+# Compiled XPath query for the link to the excel file of abandoned wells, which
+# is the link whose text contains 'Excel Version' (in any case).
+_EXCEL_LINK_XPATH = lxml.etree.XPath(
+    "//a[@href and contains(translate(normalize-space(.), 'EXCLVRSION', 'exclvrsion'),"
+    " 'excel version')]"
+)
+
+# Compiled XPath queries that are evaluated for every row, cell, or link of a
+# table.  A query passed to element.xpath() as a string is compiled again on
+# every call.
+_CELLS_XPATH = lxml.etree.XPath('./td')
+_HEADER_AND_DATA_CELLS_XPATH = lxml.etree.XPath('./td|./th')
+_LINKS_XPATH = lxml.etree.XPath('.//a[@href]')
+
+# Compiled XPath query for the first piece of text directly inside a tag that
+# contains a digit.  The digit test is done by deleting the digits with
+# translate() and checking whether the text changed.
+_NUMBERED_TEXT_XPATH = lxml.etree.XPath("text()[translate(., '0123456789', '') != .][1]")
 
 
 ########################################
 # Functions for fetching and saving data
 ########################################
 
-def _get(url):
-    """Perform repetitive tasks for executing HTTP GET."""
+class _AdaptiveTokenBucket:
+    """Thread-safe token bucket whose rate (in tokens per second) is lowered
+    multiplicatively when RRC is struggling and raised additively when it is
+    not, always staying between min_rate and max_rate."""
+
+    def __init__(self, max_rate, min_rate, step, capacity=1):
+        self._max_rate = max_rate
+        self._min_rate = min_rate
+        self._step = step
+        self._capacity = capacity
+        self._rate = max_rate
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self._capacity,
+                           self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take a token, sleeping until one is available.
+
+        The token is reserved while the lock is held, and the sleep happens
+        after the lock is released, so threads that are waiting queue up one
+        token interval apart and do not block changes to the rate."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self._rate
+        if wait > 0:
+            time.sleep(wait)
+
+    def increase_rate(self):
+        with self._lock:
+            self._refill()
+            self._rate = min(self._max_rate, self._rate + self._step)
+
+    def decrease_rate(self):
+        with self._lock:
+            self._refill()
+            self._rate = max(self._min_rate, self._rate / 2)
+
+
+_BUCKET = _AdaptiveTokenBucket(max_rate=1 / _DELAY, min_rate=_MIN_RATE,
+                               step=_RATE_STEP)
+
+
+def _adjust_rate(r):
+    """Slow down requests if the response shows that RRC is rate limiting or
+    failing, and otherwise speed them back up."""
+    if r.status_code == requests.codes.too_many_requests or r.status_code >= 500:
+        _BUCKET.decrease_rate()
+    else:
+        _BUCKET.increase_rate()
+
+
+def _get_retry_wait(attempt, r=None):
+    """Return the time in seconds to wait after a failed attempt at a request,
+    where attempt counts the earlier attempts.
+
+    If the failed attempt gave a response r with a Retry-After header, the wait
+    given by RRC is used.  Otherwise the wait doubles with each attempt.
+    """
+    retry_after = r.headers.get('Retry-After') if r is not None else None
+    if retry_after:
+        try:
+            return max(0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+    return _add_jitter(2 ** attempt)
+
+
+def _get(url, stream=False, headers=None):
+    """Perform repetitive tasks for executing HTTP GET.
+
+    If stream is True, the body of the response is not downloaded until it is
+    read by the caller, who is then responsible for closing the response.  Any
+    headers passed to the function are added to the default headers of the
+    session.
+
+    A response with a status in _RETRY_STATUSES, or a read timeout, is retried
+    up to _MAX_RETRIES times.
+    """
+    for attempt in range(_MAX_RETRIES + 1):
+        # Wait for a token immediately before performing each attempt, so that
+        # there is no need to worry about pacing in other parts of the code.
+        _BUCKET.acquire()
+        try:
+            r = _SESSION.get(url, stream=stream, headers=headers, timeout=_TIMEOUT)
+        except requests.ReadTimeout:
+            _BUCKET.decrease_rate()
+            if attempt == _MAX_RETRIES:
+                raise
+            wait = _get_retry_wait(attempt)
+            reason = 'read timeout'
+        else:
+            _adjust_rate(r)
+            if r.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                break
+            wait = _get_retry_wait(attempt, r)
+            if wait > _MAX_RETRY_AFTER:
+                logging.error(f'Not retrying after HTTP status {r.status_code}, since '
+                              f'RRC asked for a wait of {wait:.0f} seconds, for\n{url}\n')
+                break
+            r.close()
+            reason = f'HTTP status {r.status_code}'
+        logging.info(f'Retrying in {wait:.1f} seconds after {reason} for\n{url}\n')
+        time.sleep(wait)
 
-    headers = {'user-agent': _USER_AGENT}
-    r = requests.get(url, headers=headers)
     try:
         r.raise_for_status()
     except requests.HTTPError:
@@ -68,56 +344,254 @@ def _get(url):
         # is concerned with processing data from the url.
         raise
     else:
-        logging.info(f'Successfully downloaded data for\n{url}\n')
-
-    # Enforce a delay immediately after performing the request, so that there is
-    # no need to worry about this in other parts of the code.
-    time.sleep(_DELAY)
+        if r.status_code == requests.codes.not_modified:
+            logging.info(f'Data unchanged since previous download for\n{url}\n')
+        else:
+            logging.info(f'Successfully downloaded data for\n{url}\n')
 
     return r
 
 
-def get_html_string(url):
-    """Return the html string for a url, raising an exception if unsuccessful."""
-    r = _get(url)
-    return r.text
-
-
 def get_binary_file(url, relative_path):
     """Download and save a binary file, raising an exception if the download is
     unsuccessful.
 
     Executes HTTP GET and saves the result as a binary file at:
 
-    Path(_DATA_ROOT) / relative_path
+    _DATA_ROOT / relative_path
 
     Any missing parents of the file path are created by the function.
+
+    If the file was saved by a previous run, a conditional request is made, and
+    the saved file is kept as is when RRC reports that it has not changed.  If
+    the file exists but no validators were saved for it, HTTP HEAD is used to
+    check whether it matches the data at url before downloading it again.  No
+    request at all is made if the file was checked within the last _MAX_AGE
+    seconds.
     """
+    file_path = _DATA_ROOT / relative_path
+    if _is_fresh(url, relative_path):
+        logging.info(f'Using recently checked file\n{file_path}\n')
+        _parse_if_unparsed(file_path)
+        return
+    headers = _get_conditional_headers(url, relative_path)
+    if not headers and file_path.exists() and _matches_saved_file(url, relative_path):
+        # A file saved by an earlier version of this module may have only the
+        # older _parsed.txt and _metadata.txt outputs.
+        _parse_if_unparsed(file_path)
+        return
     try:
-        r = _get(url)
+        r = _get(url, stream=True, headers=headers)
     except requests.HTTPError:
         return
 
-    file_path = Path(_DATA_ROOT) / relative_path
+    if r.status_code == requests.codes.not_modified:
+        r.close()
+        _save_validators(url, relative_path, r)
+        _parse_if_unparsed(file_path)
+        return
+
+    # The data is written to a temporary file that replaces file_path only
+    # after the download completes, so that an interrupted download never
+    # leaves a truncated file that matches the saved validators.  The name of
+    # the temporary file includes the thread id, in case two download threads
+    # are ever saving data to the same path.  If the download fails, the
+    # temporary file is removed.
     _check_parents(file_path)
-    file_path.write_bytes(r.content)
+    partial_path = file_path.with_name(f'{file_path.name}.{threading.get_ident()}.part')
+    try:
+        with r, partial_path.open('wb') as binary_file:
+            for chunk in r.iter_content(chunk_size=_CHUNK_SIZE):
+                binary_file.write(chunk)
+        partial_path.replace(file_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
     logging.info(f'Saved binary data to\n{file_path}\n')
+    _save_validators(url, relative_path, r)
 
     if file_path.suffix == '.pdf':
-        parse_pdf(file_path)
+        _parse_futures.append(_PARSE_EXECUTOR.submit(parse_pdf, file_path))
+
 
+def _parse_if_unparsed(file_path):
+    """Submit a saved pdf file for parsing if no text file was saved for it by
+    parse_pdf.
 
-def get_soup(url, filename):
-    """Get the BeautifulSoup tree for a url and save prettified version of the html. """
-    html_string = get_html_string(url)
-    soup = BeautifulSoup(html_string, 'html.parser')
-    html_string = soup.prettify()
+    This is used when a saved file is kept rather than downloaded again, so
+    that a file whose parsing raised an exception (or was never attempted) in
+    an earlier run is parsed now.  A file in which no text was found has an
+    empty text file, so it is not parsed again.
+    """
+    if (file_path.suffix == '.pdf'
+            and not _parsed_content_path(file_path).exists()):
+        _parse_futures.append(_PARSE_EXECUTOR.submit(parse_pdf, file_path))
 
-    file_path = Path(_DATA_ROOT) / _SAVED_PAGES / filename
+
+def download_files(downloads):
+    """Download and save a list of binary files using _DOWNLOAD_WORKERS threads.
+
+    downloads is a list of (url, relative_path) tuples, each of which is passed
+    to get_binary_file.  A url that appears more than once is downloaded only
+    once, to the first relative_path given for it.
+    """
+    unique_downloads = {}
+    for url, relative_path in downloads:
+        unique_downloads.setdefault(url, relative_path)
+    with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as executor:
+        futures = [executor.submit(get_binary_file, url, relative_path)
+                   for url, relative_path in unique_downloads.items()]
+    # Re-raise any exception raised in a download thread.
+    for future in futures:
+        future.result()
+
+
+def get_tree(url, filename):
+    """Get the lxml tree for a url, raising an exception if unsuccessful.
+
+    XPath queries on the lxml tree run in C rather than in python, which keeps
+    the processing of the RRC pages fast.
+
+    The response is streamed into the parser as it arrives, and at the same
+    time into the copy of the page cached as filename in _PAGE_CACHE.  If the
+    cached copy was checked within the last _MAX_AGE seconds, or if RRC reports
+    that the page has not changed, the cached copy is parsed instead.
+    """
+    relative_path = _PAGE_CACHE / filename
+    file_path = _DATA_ROOT / relative_path
+    if _is_fresh(url, relative_path):
+        logging.info(f'Using recently checked page\n{file_path}\n')
+        return _parse_cached_page(url, file_path)
+
+    headers = _get_conditional_headers(url, relative_path)
+    r = _get(url, stream=True, headers=headers)
+    if r.status_code == requests.codes.not_modified:
+        r.close()
+        _save_validators(url, relative_path, r)
+        return _parse_cached_page(url, file_path)
+
+    # As for binary files, the page is cached through a temporary file, so that
+    # an interrupted download never leaves a truncated copy.
     _check_parents(file_path)
-    file_path.write_text(html_string)
+    partial_path = file_path.with_name(f'{file_path.name}.{threading.get_ident()}.part')
+    parser = lxml.html.HTMLParser(encoding=r.encoding)
+    try:
+        with r, partial_path.open('wb') as html_file:
+            for chunk in r.iter_content(chunk_size=_CHUNK_SIZE):
+                html_file.write(chunk)
+                parser.feed(chunk)
+        partial_path.replace(file_path)
+    finally:
+        partial_path.unlink(missing_ok=True)
+    tree = parser.close()
+    _save_validators(url, relative_path, r, encoding=r.encoding)
+    return tree
+
+
+def _parse_cached_page(url, file_path):
+    """Parse the copy of the page for a url cached at file_path, using the
+    character encoding given by RRC when the page was downloaded."""
+    encoding = _load_validators()[url].get('encoding')
+    parser = lxml.html.HTMLParser(encoding=encoding)
+    return lxml.html.parse(str(file_path), parser).getroot()
+
+
+def _load_validators():
+    """Return the dictionary of saved HTTP validators, reading it from
+    _VALIDATORS the first time that the function is called."""
+    global _validators
+    with _VALIDATORS_LOCK:
+        if _validators is None:
+            file_path = _DATA_ROOT / _VALIDATORS
+            try:
+                _validators = json.loads(file_path.read_text())
+            except (FileNotFoundError, ValueError):
+                _validators = {}
+    return _validators
+
+
+def _is_fresh(url, relative_path):
+    """Return True if the file saved at relative_path for a url was downloaded
+    or checked against RRC within the last _MAX_AGE seconds."""
+    validators = _load_validators().get(url)
+    file_path = _DATA_ROOT / relative_path
+    return (validators is not None and validators['path'] == str(relative_path)
+            and time.time() - validators.get('checked', 0) <= _MAX_AGE
+            and file_path.exists())
+
+
+def _get_conditional_headers(url, relative_path):
+    """Return headers for a conditional request for a url, or an empty
+    dictionary if no copy of the data is saved at relative_path."""
+    validators = _load_validators().get(url)
+    file_path = _DATA_ROOT / relative_path
+    if (not validators or validators['path'] != str(relative_path)
+            or not file_path.exists()):
+        return {}
+
+    headers = {}
+    if validators['etag']:
+        headers['If-None-Match'] = validators['etag']
+    if validators['last_modified']:
+        headers['If-Modified-Since'] = validators['last_modified']
+    return headers
+
+
+def _matches_saved_file(url, relative_path):
+    """Use HTTP HEAD to check whether a file saved without validators (for
+    example, by an earlier version of this module) matches the data at url.
+
+    The saved file is taken to match if it has the size given by the
+    Content-Length header and was saved after the time given by the
+    Last-Modified header.  If the file matches, the validators from the HEAD
+    response are saved, so that later runs can use conditional requests.
+    """
+    file_path = _DATA_ROOT / relative_path
+    _BUCKET.acquire()
+    try:
+        r = _SESSION.head(url, allow_redirects=True, timeout=_TIMEOUT)
+        _adjust_rate(r)
+        r.raise_for_status()
+        content_length = int(r.headers['Content-Length'])
+        last_modified = parsedate_to_datetime(r.headers['Last-Modified'])
+    except (requests.RequestException, KeyError, TypeError, ValueError):
+        return False
+
+    file_stat = file_path.stat()
+    if (content_length != file_stat.st_size
+            or last_modified.timestamp() > file_stat.st_mtime):
+        return False
 
-    return soup
+    logging.info(f'Saved file matches data for\n{url}\n')
+    _save_validators(url, relative_path, r)
+    return True
+
+
+def _save_validators(url, relative_path, r, encoding=None):
+    """Save the HTTP validators from a response together with the path at which
+    the data was saved, the time at which it was checked, and (for a page) the
+    character encoding of the saved data.
+
+    A validator missing from the response (as it may be from a 304 response) is
+    kept from the previously saved validators for the same url and path, as is
+    the encoding for a 304 response.
+    """
+    with _VALIDATORS_LOCK:
+        validators = _load_validators()
+        previous = validators.get(url)
+        if previous is None or previous['path'] != str(relative_path):
+            previous = {}
+        if r.status_code == requests.codes.not_modified:
+            encoding = previous.get('encoding')
+        validators[url] = {
+            'path': str(relative_path),
+            'etag': r.headers.get('ETag', previous.get('etag')),
+            'last_modified': r.headers.get('Last-Modified',
+                                           previous.get('last_modified')),
+            'encoding': encoding,
+            'checked': time.time(),
+        }
+        file_path = _DATA_ROOT / _VALIDATORS
+        file_path.write_text(json.dumps(validators, indent=4))
 
 
 ########################################
@@ -126,40 +600,146 @@ def get_soup(url, filename):
 ########################################
 
 def parse_pdf(file_path):
-    """Use tika to parse a pdf file and save the results.
+    """Use poppler or tika to parse a pdf file and save the results.
 
     If text is successfully extracted from the pdf file, two files are saved,
     one containing metadata for the pdf file and other containing the extracted
     text content.
 
     For a pdf file named Fiscal_Year_2019.pdf, the filenames for saved metadata
-    and text content are Fiscal_Year_2019_metadata.txt,
-    Fiscal_Year_2019_content.txt
+    and text content are Fiscal_Year_2019_metadata.json,
+    Fiscal_Year_2019_parsed.txt.gz
+
+    The text content is compressed with gzip.  It can be read back using
+    read_parsed_text.  If no text content is found, an empty text file is saved
+    (and no metadata), which records that the pdf file has been parsed.
     """
-    parent = file_path.parent
-    metadata_filename = file_path.stem + '_metadata.txt'
-    content_filename = file_path.stem + '_parsed.txt'
+    metadata_path = file_path.parent / (file_path.stem + '_metadata.json')
+    parsed_content_path = _parsed_content_path(file_path)
 
     # Parse the downloaded pdf.
     logging.info(f'Attempting to extract text content from pdf file\n{file_path}\n')
-    parsed = parser.from_file(str(file_path))
+    if _PDFTOTEXT:
+        parsed = _parse_with_poppler(file_path)
+    else:
+        parsed = _parse_with_tika(file_path)
 
     if parsed['content']:
 
-        # Save the parsed text.  Since parsed['metadata'] is a dictionary, we need
-        # to use pprint to get a readable text file.
-        with open(parent / metadata_filename, 'w') as metadata_file:
-            pprint.pprint(parsed['metadata'], stream=metadata_file,
-                          indent=4, width=130)
+        # Save the parsed text.  Since parsed['metadata'] is a dictionary, it is
+        # saved as json, which is both readable and easy to load.  Any value
+        # that json cannot represent is saved as its string form.
+        metadata_path.write_text(json.dumps(parsed['metadata'], indent=4,
+                                            sort_keys=True, default=str))
 
-        parsed_content_path = parent / content_filename
-        parsed_content_path.write_text(parsed['content'])
+        with gzip.open(parsed_content_path, 'wt') as content_file:
+            content_file.write(parsed['content'])
         logging.info(f'Saved parsed text to\n{parsed_content_path}\n')
 
     else:
+        with gzip.open(parsed_content_path, 'wt'):
+            pass
         logging.info(f'No text content found in pdf file\n{file_path}\n')
 
 
+def _parse_with_poppler(file_path):
+    """Extract text content and metadata from a pdf file using poppler.
+
+    The return value has the same form as the value returned by tika: a
+    dictionary with keys 'content' and 'metadata', where 'content' is None if
+    no text was found.
+    """
+    # As with tika, a damaged pdf file gives no content rather than an error.
+    try:
+        completed = subprocess.run([_PDFTOTEXT, '-layout', '-enc', 'UTF-8', str(file_path), '-'],
+                                   capture_output=True, check=True)
+    except subprocess.CalledProcessError as error:
+        _log_poppler_error(error, file_path)
+        return {'content': None, 'metadata': {}}
+    content = completed.stdout.decode('utf-8', errors='replace')
+
+    # Each line of output from pdfinfo has the form 'Key:   value'.  If pdfinfo
+    # fails, the text is kept and saved with empty metadata.
+    metadata = {}
+    if _PDFINFO:
+        try:
+            completed = subprocess.run([_PDFINFO, str(file_path)],
+                                       capture_output=True, check=True)
+        except subprocess.CalledProcessError as error:
+            _log_poppler_error(error, file_path)
+        else:
+            for line in completed.stdout.decode('utf-8', errors='replace').splitlines():
+                key, separator, value = line.partition(':')
+                if separator:
+                    metadata[key.strip()] = value.strip()
+
+    if not content.strip():
+        content = None
+    return {'content': content, 'metadata': metadata}
+
+
+def _log_poppler_error(error, file_path):
+    """Log the failure of a poppler utility on a pdf file."""
+    stderr = error.stderr.decode('utf-8', errors='replace')
+    message = (f'{Path(error.cmd[0]).name} failed for pdf file\n{file_path}\n\n'
+               f'Exit status {error.returncode}:\n\n{stderr}\n')
+    logging.error(message)
+
+
+def _parse_with_tika(file_path):
+    """Extract text content and metadata from a pdf file using tika.
+
+    tika is imported the first time that the function is called, so that runs
+    that never parse a pdf file with tika do not pay for it.  The tika server
+    can be pinned to an existing long-lived server by setting the environment
+    variables TIKA_SERVER_ENDPOINT and TIKA_CLIENT_ONLY.
+    """
+    global _tika_parser
+    with _TIKA_LOCK:
+        if _tika_parser is None:
+            from tika import parser
+            import tika.tika
+
+            # Before each call, tika checks whether the tika server is running
+            # by opening a socket to it, and starts the server if necessary.
+            # The server stays up for the rest of the run once the first call
+            # has returned, so put tika in client-only mode to skip the check
+            # on later calls.
+            parsed = parser.from_file(str(file_path),
+                                      requestOptions={'timeout': _TIKA_TIMEOUT})
+            tika.tika.TikaClientOnly = True
+            _tika_parser = parser
+            return parsed
+
+    return _tika_parser.from_file(str(file_path),
+                                  requestOptions={'timeout': _TIKA_TIMEOUT})
+
+
+def read_parsed_text(file_path):
+    """Return the text content extracted from a pdf file by parse_pdf.
+
+    file_path is the path of the pdf file itself.
+    """
+    with gzip.open(_parsed_content_path(file_path), 'rt') as content_file:
+        return content_file.read()
+
+
+def _parsed_content_path(file_path):
+    """Return the path at which parse_pdf saves the text content of a pdf
+    file."""
+    return file_path.parent / (file_path.stem + '_parsed.txt.gz')
+
+
+def _finish_parsing():
+    """Wait for background parsing of pdf files to finish.
+
+    An exception raised while parsing a pdf file is re-raised here.
+    """
+    _PARSE_EXECUTOR.shutdown(wait=True)
+    for future in _parse_futures:
+        future.result()
+
+
 ########################################
 # URL-specific scraping functions
 ########################################
@@ -186,38 +766,55 @@ def parse_pdf(file_path):
 # So in locating relevant tags, a natural approach is to start from one of the
 # few tags with an id attribute and then navigate to the tag(s) to be scraped.
 # This approach is used in the functions below.
+#
+# The functions that find links to binary files do not download the files
+# themselves.  Instead, each returns a list of (url, relative_path) tuples for
+# the files, and main() downloads the files from all pages in a single pass
+# through download_files.
 
 def get_districts():
     """Scrape a table of RRC districts/district codes and corresponding
     counties/county codes."""
 
+    # Internal function to get the text of the cells in a table row, in the same
+    # form that pandas.read_html would give: whitespace is collapsed, empty
+    # cells are None, and a cell spanning several columns is repeated for each
+    # of them.
+    def get_cells(row):
+        cells = []
+        for cell in _HEADER_AND_DATA_CELLS_XPATH(row):
+            text = ' '.join(cell.text_content().split()) or None
+            cells.extend([text] * int(cell.get('colspan', 1)))
+        return cells
+
     url = 'https://www.rrc.state.tx.us/about-us/organization-activities/rrc-locations/counties-by-dist/'
     try:
-        soup = get_soup(url, 'districts.html')
+        tree = get_tree(url, 'districts.html')
     except requests.HTTPError:
         return
 
-    table_html = str(soup.table)
     # The try block attempts to extract a data frame of RRC district codes,
-    # which are needed for the choropleth map in the web app.
+    # which are needed for the choropleth map in the web app.  The data frame
+    # is built directly from the cells of the table, using the first row as the
+    # column names.
     try:
-        df = pd.read_html(table_html)[0]
-
-        # Set the first row to be the column names.
-        df.rename(columns=df.iloc[0], inplace=True)
-        df.drop(index=0, inplace=True)
-
-        to_concat = []
-        for start_col in range(0, 12, 4):
-            end_col = start_col + 4
-            sub_df = df.iloc[:, start_col:end_col]
-            # Set the first column to be the index.
-            sub_df.set_index('County', drop=True, inplace=True)
-            to_concat.append(sub_df)
-        df = pd.concat(to_concat, axis=0)
-
-        # Because of the way the html table was formatted, one of the concatenated
-        # dataframes has a row of missing data.
+        rows = [get_cells(row) for row in tree.find('.//table').xpath('.//tr')]
+        df = pd.DataFrame(rows[1:], columns=rows[0])
+
+        # The table consists of blocks of four columns (County, CC, DC, District
+        # Office) placed side by side.  Stack the blocks on top of one another,
+        # first block first, with a single reshape of the underlying array.
+        row_count, column_count = df.shape
+        blocks = (df.to_numpy()
+                  .reshape(row_count, column_count // 4, 4)
+                  .swapaxes(0, 1)
+                  .reshape(-1, 4))
+        df = pd.DataFrame(blocks, columns=df.columns[:4])
+        # Set the first column to be the index.
+        df.set_index('County', drop=True, inplace=True)
+
+        # Because of the way the html table was formatted, one of the stacked
+        # blocks has a row of missing data.
         df.dropna(axis=0, inplace=True)
 
         # Drop the column giving district offices.
@@ -230,26 +827,31 @@ def get_districts():
         message = f'Successfully extracted data frame of RRC district codes from\n{url}\n'
         logging.info(message)
 
-        file_path = Path(_DATA_ROOT) / 'district_codes' / 'RRC_district_codes.csv'
+        file_path = _DATA_ROOT / 'district_codes' / 'RRC_district_codes.csv'
         _check_parents(file_path)
         df.to_csv(file_path)
         logging.info(f'Saved table of RRC district codes to\n{file_path}\n')
 
 
 def get_cleanup_reports():
-    """Scrape reports on efforts to plug and clean up abandoned wells."""
+    """Scrape links to reports on efforts to plug and clean up abandoned wells.
+
+    Returns a list of (url, relative_path) tuples for the reports.
+    """
 
     url = 'https://www.rrc.state.tx.us/oil-gas/environmental-cleanup-programs/oil-gas-regulation-and-cleanup-fund/'
     try:
-        soup = get_soup(url, 'cleanup_reports.html')
+        tree = get_tree(url, 'cleanup_reports.html')
     except requests.HTTPError:
-        return
+        return []
 
-    header = soup.find(id='OCP_quarterly').parent
-    _get_quarterly_reports(header)
+    header = tree.get_element_by_id('OCP_quarterly').getparent()
+    downloads = _get_quarterly_reports(header)
 
-    header = soup.find(id='OCP_annual').parent
-    _get_annual_reports(header)
+    header = tree.get_element_by_id('OCP_annual').getparent()
+    downloads.extend(_get_annual_reports(header))
+
+    return downloads
 
 
 # The helper functions _get_quarterly reports and _get_annual_reports could be
@@ -258,69 +860,85 @@ def get_cleanup_reports():
 # short and readable.
 
 def _get_quarterly_reports(header):
-    table = header.find_next_sibling()
-    rows = table.find_all('tr')
+    table = header.xpath('following-sibling::*[1]')[0]
+    rows = table.xpath('.//tr')
 
     # Create a list of subdirectories in which the quarterly reports for an
     # individual year will be stored.
-    year_tags = rows[0].find_all(
-        # Tests whether a tag is type 'td' and also has a string
-        lambda tag: tag.string if tag.name == 'td' else False
-    )
-    years = [year_tag.string.strip().replace(' ', '_')
+    year_tags = rows[0].xpath('./td[normalize-space()]')
+    years = [year_tag.text_content().strip().translate(_FILENAME_TRANS)
              for year_tag in year_tags]
-    quarterly_reports_dir = Path('cleanup_reports') / 'quarterly'
-    year_dirs = [quarterly_reports_dir / year
+    year_dirs = [_QUARTERLY_REPORTS_DIR / year
                  for year in years]
 
-    # Download and save the quarterly reports.  The filenames are inconsistent
+    # Collect the links to the quarterly reports.  The filenames are inconsistent
     # for different years.  The text of the a tags that link to the reports is
     # used to generate consistent, understandable filenames.
-    for row in rows[1:]:
-        cells = row.find_all('td')
-        for index, cell in enumerate(cells):
-            a_tag = cell.find('a')
-            if a_tag:
-                filename = a_tag.string.strip().replace(' ', '_') + '.pdf'
-                relative_path = year_dirs[index] / filename
-                url = _BASE_URL + a_tag['href']
-                get_binary_file(url, relative_path)
+    downloads = []
+    for index, text, href in _extract_table_links(rows[1:]):
+        filename = text.translate(_FILENAME_TRANS) + '.pdf'
+        relative_path = year_dirs[index] / filename
+        url = _BASE_URL + href
+        downloads.append((url, relative_path))
+    return downloads
 
 
 def _get_annual_reports(header):
-    table = header.find_next_sibling()
-    annual_reports_dir = Path('cleanup_reports') / 'annual'
-    a_tags = table.find_all('a')
-    for a_tag in a_tags:
-        filename = a_tag.string.strip().replace(' ', '_') + '.pdf'
-        relative_path = annual_reports_dir / filename
-        url = _BASE_URL + a_tag['href']
-        get_binary_file(url, relative_path)
+    table = header.xpath('following-sibling::*[1]')[0]
+    downloads = []
+    for _, text, href in _extract_table_links(table.xpath('.//tr')):
+        filename = text.translate(_FILENAME_TRANS) + '.pdf'
+        relative_path = _ANNUAL_REPORTS_DIR / filename
+        url = _BASE_URL + href
+        downloads.append((url, relative_path))
+    return downloads
+
+
+def _extract_table_links(rows):
+    """Return a list of (column_index, text, href) tuples for the links in the
+    cells of a list of table rows.
+
+    Only the cells that are direct children of a row are used, so that the
+    index of a cell always matches the index of its column.  The text of each
+    link is stripped of leading and trailing whitespace.  Links with no text
+    (which are not visible in the browser) are skipped, since the text is used
+    to generate the filename for the linked file.
+    """
+    links = []
+    for row in rows:
+        cells = _CELLS_XPATH(row)
+        for index, cell in enumerate(cells):
+            for a_tag in _LINKS_XPATH(cell):
+                text = a_tag.text_content().strip()
+                if text:
+                    links.append((index, text, a_tag.get('href')))
+    return links
 
 
 def get_well_distribution_reports():
-    """Scrape reports giving the distribution of wells (including abandoned wells)."""
+    """Scrape links to reports giving the distribution of wells (including
+    abandoned wells).
+
+    Returns a list of (url, relative_path) tuples for the reports.
+    """
 
     # Internal function to generate a filename based on the text for an link tag
     # (<a ...>), if there is text in the tag.  This is needed because a link tag
-    # may have no text (i.e., not be visible in the browser), or it may have
-    # text included in the tag contents even when tag.string is None.  If the
-    # text is included in tag.contents, there may be other junk (such as <br/>)
-    # in tag.contents.  Since tag.contents is messy, we need to filter it with
-    # the function below.
+    # may have no text (i.e., not be visible in the browser), or its text may
+    # be split into several pieces by other junk (such as <br/>) among the
+    # children of the tag.  The function uses the first piece of text directly
+    # inside the tag that contains a number.
     def get_filename(tag):
-        for element in tag.contents:
-            if re.search(r'\d+', str(element)):
-                return element.strip().replace(' ', '_').replace(',', '') + '.pdf'
+        texts = _NUMBERED_TEXT_XPATH(tag)
+        if texts:
+            return texts[0].strip().translate(_FILENAME_TRANS) + '.pdf'
         return None
 
     url = 'https://www.rrc.state.tx.us/oil-gas/research-and-statistics/well-information/well-distribution-tables-well-counts-by-type-and-status/'
     try:
-        soup = get_soup(url, 'well_distributions.html')
+        tree = get_tree(url, 'well_distributions.html')
     except requests.HTTPError:
-        return
-
-    distribution_reports_dir = Path('well_distributions')
+        return []
 
     # The links to monthly reports on well distribution are organized into a
     # table.  The first and third row of the table are headings corresponding to
@@ -330,7 +948,8 @@ def get_well_distribution_reports():
     # Rather than using the headings to organize the downloaded files into
     # different subdirectories, I will extract all links in the table and then use
     # regular expressions to sort them into subdirectories based on year.
-    a_tags = soup.table.find_all('a')
+    a_tags = _LINKS_XPATH(tree.find('.//table'))
+    downloads = []
     for a_tag in a_tags:
         # What we want to scrape is the links with text on the page, but
         # some of the a tags in table cells do hot have any text.  These
@@ -342,33 +961,31 @@ def get_well_distribution_reports():
         # are skipped.
         filename = get_filename(a_tag)
         if filename:
-            year = re.search(r'(\d{4})\.', filename).group(1)
-            relative_path = distribution_reports_dir / year / filename
-            url = _BASE_URL + a_tag['href']
-            get_binary_file(url, relative_path)
+            year = _YEAR_RE.search(filename).group(1)
+            relative_path = _DISTRIBUTION_REPORTS_DIR / year / filename
+            url = _BASE_URL + a_tag.get('href')
+            downloads.append((url, relative_path))
+    return downloads
 
 
 def get_abandoned_wells_report():
-    """Download an excel file giving information about abandoned wells that
-    currently need to plugged."""
+    """Scrape the link to an excel file giving information about abandoned wells
+    that currently need to plugged.
 
-    def has_excel_string(tag):
-        if tag.string and 'excel version' in tag.string.lower():
-            return True
-        else:
-            return False
+    Returns a list containing a (url, relative_path) tuple for the file.
+    """
 
     url = 'https://www.rrc.state.tx.us/oil-gas/research-and-statistics/well-information/orphan-wells-12-months/'
     try:
-        soup = get_soup(url, 'abandoned_wells.html')
+        tree = get_tree(url, 'abandoned_wells.html')
     except requests.HTTPError:
-        return
+        return []
 
-    a_tag = soup.find(has_excel_string)
-    filename = a_tag['title']
-    relative_path = Path('abandoned_wells') / filename
-    url = _BASE_URL + a_tag['href']
-    get_binary_file(url, relative_path)
+    a_tag = _EXCEL_LINK_XPATH(tree)[0]
+    filename = a_tag.get('title')
+    relative_path = _ABANDONED_WELLS_DIR / filename
+    url = _BASE_URL + a_tag.get('href')
+    return [(url, relative_path)]
 
 
 ########################################
@@ -377,8 +994,16 @@ def get_abandoned_wells_report():
 
 def _check_parents(file_path):
     """Check whether the parents of a file path exist and make them if not."""
-    parent = file_path.parents[0]
-    parent.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(str(file_path.parent))
+
+
+# Many files are saved to the same directory, so the result is cached to avoid
+# repeating the mkdir system call for a directory that is already known to
+# exist.
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path_string):
+    """Make a directory and any missing parents, if they do not already exist."""
+    Path(path_string).mkdir(parents=True, exist_ok=True)
 
 
 def _initialize_logging():
@@ -386,7 +1011,7 @@ def _initialize_logging():
 
     Print a message to stdout giving the location of the log file.
     """
-    log_file = Path(_DATA_ROOT) / 'scrape.log'
+    log_file = _DATA_ROOT / 'scrape.log'
     _check_parents(log_file)
     file_handler = logging.FileHandler(filename=str(log_file), mode='w')
     console_handler = logging.StreamHandler(sys.stdout)
@@ -405,9 +1030,20 @@ def main():
     oil and gas wells."""
     _initialize_logging()
     get_districts()
-    get_cleanup_reports()
-    get_well_distribution_reports()
-    get_abandoned_wells_report()
+
+    # Find the links on all pages first, and then download all of the linked
+    # files back to back through the shared session.
+    downloads = []
+    downloads.extend(get_cleanup_reports())
+    downloads.extend(get_well_distribution_reports())
+    downloads.extend(get_abandoned_wells_report())
+
+    # Parsing is finished even if a download fails, so that errors from parsing
+    # the files already downloaded are not lost.
+    try:
+        download_files(downloads)
+    finally:
+        _finish_parsing()
 
 
 if __name__ == '__main__':